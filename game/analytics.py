@@ -0,0 +1,386 @@
+# game/analytics.py
+"""
+Analítica de combates en streaming.
+Los eventos (uno por acción y uno por encuentro), ya sea de partidas reales o de
+simulaciones, fluyen por un pipeline de generadores con buffer acotado hacia
+agregadores intercambiables (daño por clase, rondas hasta la victoria, uso de
+estrategias) y sumideros como SQLiteSink, que inserta por lotes en modo WAL.
+En partidas reales AsyncRecorder procesa los eventos en un hilo aparte para no
+frenar el bucle del juego, y escribe los lotes incompletos tras un momento sin eventos.
+
+Uso:
+    python -m game.analytics --fights 10000 --db combates.db
+"""
+import argparse
+import itertools
+import queue
+import random
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from game.characters import Character
+from game.commands import Command, AttackCommand, SpecialAbilityCommand
+from game.rules import RuleStrategy
+from game.simulation import CLASS_FACTORIES, DEFAULT_ABILITY_CHANCE, DEFAULT_MAX_TURNS, iter_fight
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+# --- Eventos ---
+class ActionEvent(NamedTuple):
+    session: str
+    encounter_id: int
+    turn: int # Ronda del actor: su 1.ª, 2.ª... acción de combate en el encuentro
+    actor_class: str
+    action: str # Estrategia de combate o habilidad especial usada; con RuleStrategy, la acción elegida
+    target_class: str
+    damage: int
+    target_health: int
+
+
+class EncounterEvent(NamedTuple):
+    session: str
+    encounter_id: int
+    first_class: str
+    second_class: str
+    winner_class: Optional[str] # None si es empate
+    turns: int # Rondas: acciones de combate del combatiente que más actuó
+
+
+Event = Union[ActionEvent, EncounterEvent]
+
+FLUSH = object() # Intercalado en el flujo, cierra el lote actual aunque no esté lleno
+
+
+def batched(events: Iterable[Event], size: int) -> Iterator[List[Event]]:
+    """
+    Agrupa el flujo en lotes de a lo sumo `size` eventos; nunca retiene más que eso.
+    Un FLUSH en el flujo entrega de inmediato el lote parcial que haya.
+    """
+    batch: List[Event] = []
+    for event in events:
+        if event is FLUSH:
+            if batch:
+                yield batch
+                batch = []
+            continue
+        batch.append(event)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# --- Agregadores ---
+class Aggregator(ABC):
+    @abstractmethod
+    def consume(self, event: Event):
+        pass
+
+    @abstractmethod
+    def report(self) -> str:
+        pass
+
+
+class DamageByClass(Aggregator):
+    def __init__(self):
+        self.damage: Counter = Counter()
+        self.actions: Counter = Counter()
+
+    def consume(self, event: Event):
+        if isinstance(event, ActionEvent):
+            self.damage[event.actor_class] += event.damage
+            self.actions[event.actor_class] += 1
+
+    def report(self) -> str:
+        lines = ["Daño por clase:"]
+        for name, actions in sorted(self.actions.items()):
+            lines.append(f"  {name}: {self.damage[name]} en {actions} acciones "
+                         f"({self.damage[name] / actions:.2f} por acción)")
+        return "\n".join(lines)
+
+
+class TimeToKill(Aggregator):
+    def __init__(self):
+        self.turns: Dict[str, List[int]] = defaultdict(lambda: [0, 0]) # clase -> [rondas, victorias]
+        self.draws = 0
+
+    def consume(self, event: Event):
+        if isinstance(event, EncounterEvent):
+            if event.winner_class is None:
+                self.draws += 1
+            else:
+                totals = self.turns[event.winner_class]
+                totals[0] += event.turns
+                totals[1] += 1
+
+    def report(self) -> str:
+        lines = ["Rondas hasta la victoria:"]
+        for name, (turns, wins) in sorted(self.turns.items()):
+            lines.append(f"  {name}: {turns / wins:.1f} rondas de media en {wins} victorias")
+        lines.append(f"  Empates: {self.draws}")
+        return "\n".join(lines)
+
+
+class StrategyUsage(Aggregator):
+    def __init__(self):
+        self.usage: Counter = Counter()
+
+    def consume(self, event: Event):
+        if isinstance(event, ActionEvent):
+            self.usage[(event.actor_class, event.action)] += 1
+
+    def report(self) -> str:
+        lines = ["Uso de estrategias y habilidades:"]
+        for (name, action), count in sorted(self.usage.items()):
+            lines.append(f"  {name} - {action}: {count}")
+        return "\n".join(lines)
+
+
+# --- Sumideros ---
+class Sink(ABC):
+    @abstractmethod
+    def write_batch(self, batch: List[Event]):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteSink(Sink):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS actions (
+            session TEXT, encounter_id INTEGER, turn INTEGER, actor_class TEXT,
+            action TEXT, target_class TEXT, damage INTEGER, target_health INTEGER
+        );
+        CREATE TABLE IF NOT EXISTS encounters (
+            session TEXT, encounter_id INTEGER, first_class TEXT, second_class TEXT,
+            winner_class TEXT, turns INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS actions_by_encounter ON actions (session, encounter_id);
+        CREATE INDEX IF NOT EXISTS encounters_by_winner ON encounters (winner_class);
+    """
+
+    def __init__(self, path: str):
+        # El sumidero puede crearse en un hilo y usarse solo en el hilo de AsyncRecorder
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL") # Seguro con WAL y mucho más rápido
+        self.connection.executescript(self.SCHEMA)
+
+    def write_batch(self, batch: List[Event]):
+        actions = [event for event in batch if isinstance(event, ActionEvent)]
+        encounters = [event for event in batch if isinstance(event, EncounterEvent)]
+        with self.connection: # Una transacción por lote
+            if actions:
+                self.connection.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?)", actions)
+            if encounters:
+                self.connection.executemany("INSERT INTO encounters VALUES (?, ?, ?, ?, ?, ?)", encounters)
+
+    def close(self):
+        self.connection.close()
+
+
+def run_pipeline(events: Iterable[Event],
+                 aggregators: Sequence[Aggregator] = (),
+                 sinks: Sequence[Sink] = (),
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """Consume el flujo de eventos por lotes. Retorna cuántos eventos se procesaron."""
+    processed = 0
+    for batch in batched(events, batch_size):
+        for aggregator in aggregators:
+            for event in batch:
+                aggregator.consume(event)
+        for sink in sinks:
+            sink.write_batch(batch)
+        processed += len(batch)
+    return processed
+
+
+# --- Fuentes de eventos ---
+def simulated_events(fights_per_matchup: int,
+                     rng: random.Random,
+                     session: Optional[str] = None,
+                     ability_chance: float = DEFAULT_ABILITY_CHANCE,
+                     max_turns: int = DEFAULT_MAX_TURNS) -> Iterator[Event]:
+    """Genera los eventos de combates simulados entre cada par de clases distintas."""
+    session = session or uuid.uuid4().hex
+    encounter_ids = itertools.count(1)
+    for class_a, class_b in itertools.combinations(CLASS_FACTORIES, 2):
+        factory_a, factory_b = CLASS_FACTORIES[class_a](), CLASS_FACTORIES[class_b]()
+        for _ in range(fights_per_matchup):
+            encounter_id = next(encounter_ids)
+            fighters = (factory_a.create_character(class_a), factory_b.create_character(class_b))
+            fight = iter_fight(fighters[0], fighters[1], rng, ability_chance, max_turns)
+            while True:
+                try:
+                    record = next(fight)
+                except StopIteration as finished:
+                    result = finished.value
+                    break
+                # Los combatientes alternan, así que los turnos 2k-1 y 2k son la ronda k de cada uno
+                yield ActionEvent(session, encounter_id, (record.turn + 1) // 2, record.actor.__class__.__name__,
+                                  record.action, record.target.__class__.__name__,
+                                  record.damage, record.target.health)
+            winner = None if result.winner is None else class_a if result.winner == 0 else class_b
+            yield EncounterEvent(session, encounter_id, class_a, class_b, winner, (result.turns + 1) // 2)
+
+
+class AsyncRecorder:
+    """
+    Registra eventos de una partida real. El bucle del juego solo encola el evento;
+    un hilo aparte ejecuta el pipeline. La cola es acotada: si el hilo se atrasa,
+    el juego espera en lugar de acumular memoria sin límite. Si el hilo falla
+    (ej. un error de SQLite), el error queda en `error` y los eventos siguientes se
+    descartan y se cuentan en `dropped`, sin bloquear el juego.
+
+    Las acciones del encuentro actual se retienen hasta que termina, porque el jugador
+    puede rebobinarlas con 'deshacer': discard_undone() quita las que ya no ocurrieron.
+    Si la cola queda vacía _FLUSH_INTERVAL segundos, el hilo procesa el lote parcial,
+    así que cada encuentro llega a los sumideros poco después de terminar.
+    """
+    _STOP = object()
+    _PUT_TIMEOUT = 0.1 # Segundos entre comprobaciones de que el hilo sigue vivo
+    _FLUSH_INTERVAL = 1.0 # Segundos sin eventos tras los que se escribe el lote parcial
+
+    def __init__(self,
+                 aggregators: Sequence[Aggregator] = (),
+                 sinks: Sequence[Sink] = (),
+                 batch_size: int = 100,
+                 buffer_size: int = 10_000):
+        self.aggregators = list(aggregators)
+        self.sinks = list(sinks)
+        self.session = uuid.uuid4().hex
+        self.error: Optional[BaseException] = None
+        self.dropped = 0
+        self._pending: List[Tuple[Command, Character, ActionEvent]] = []
+        self._rounds: Counter = Counter() # id(actor) -> acciones de combate en el encuentro
+        self._queue: queue.Queue = queue.Queue(maxsize=buffer_size)
+        self._thread = threading.Thread(target=self._run, args=(batch_size,), daemon=True)
+        self._thread.start()
+
+    def _events(self) -> Iterator[Event]:
+        """Eventos de la cola hasta _STOP, con un FLUSH cada vez que la cola queda inactiva."""
+        while True:
+            try:
+                item = self._queue.get(timeout=self._FLUSH_INTERVAL)
+            except queue.Empty:
+                yield FLUSH
+                continue
+            if item is self._STOP:
+                return
+            yield item
+
+    def _run(self, batch_size: int):
+        try:
+            run_pipeline(self._events(), self.aggregators, self.sinks, batch_size)
+        except Exception as error:
+            self.error = error
+
+    def _put(self, item) -> bool:
+        while self.error is None and self._thread.is_alive():
+            try:
+                self._queue.put(item, timeout=self._PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def emit(self, event: Event):
+        if not self._put(event):
+            self.dropped += 1
+
+    def record_command(self, encounter_id: int, command: Command):
+        """Registra un AttackCommand o SpecialAbilityCommand ya ejecutado a través de CommandHistory."""
+        if isinstance(command, AttackCommand):
+            actor, target, strategy = command.attacker, command.target, command.attacker.combat_strategy
+            # Una RuleStrategy puede atacar, defenderse, lanzar un hechizo...: se registra lo que eligió
+            action = strategy.last_action if isinstance(strategy, RuleStrategy) else strategy.__class__.__name__
+        elif isinstance(command, SpecialAbilityCommand) and command.target is not None:
+            actor, target, action = command.actor, command.target, command.actor.special_ability_name()
+        else:
+            return
+        damage = 0
+        if command.delta is not None: # La salud perdida ya está en el delta del comando
+            damage = sum(old - new for character, attr, old, new in command.delta.changes
+                         if character is target and attr == "health")
+        self._rounds[id(actor)] += 1
+        self._pending.append((command, actor, ActionEvent(
+            self.session, encounter_id, self._rounds[id(actor)], actor.__class__.__name__, action,
+            target.__class__.__name__, damage, target.health)))
+
+    def discard_undone(self):
+        """Olvida las acciones cuyos comandos se deshicieron (Command.undo deja delta en None)."""
+        self._pending = [entry for entry in self._pending if entry[0].delta is not None]
+        self._rounds = Counter(id(actor) for _, actor, _ in self._pending)
+
+    def _flush_pending(self):
+        for _, _, event in self._pending:
+            self.emit(event)
+        self._pending = []
+        self._rounds.clear()
+
+    def record_encounter(self, encounter_id: int, first: Character, second: Character,
+                         winner: Optional[Character]):
+        """Cierra el encuentro: emite sus acciones y el resumen, con las rondas del que más actuó."""
+        turns = max(self._rounds[id(first)], self._rounds[id(second)])
+        self._flush_pending()
+        self.emit(EncounterEvent(self.session, encounter_id, first.__class__.__name__,
+                                 second.__class__.__name__,
+                                 winner.__class__.__name__ if winner is not None else None, turns))
+
+    def close(self):
+        """Emite lo pendiente, espera al hilo y cierra los sumideros. No bloquea si el hilo falló."""
+        self._flush_pending()
+        if self._put(self._STOP):
+            self._thread.join()
+        for sink in self.sinks:
+            sink.close()
+
+
+def summarize(path: str) -> str:
+    """Consultas de ejemplo sobre una base de datos generada por SQLiteSink."""
+    connection = sqlite3.connect(path)
+    try:
+        lines = ["Tasa de victoria por clase (base de datos):"]
+        rows = connection.execute("""
+            SELECT class, SUM(won), COUNT(*) FROM (
+                SELECT first_class AS class, winner_class = first_class AS won FROM encounters
+                UNION ALL
+                SELECT second_class, winner_class = second_class FROM encounters
+            ) GROUP BY class ORDER BY class""").fetchall()
+        for name, wins, total in rows:
+            lines.append(f"  {name}: {(wins or 0) / total:.1%} de {total} encuentros")
+        return "\n".join(lines)
+    finally:
+        connection.close()
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Simula combates y guarda su analítica en SQLite.")
+    parser.add_argument("--fights", type=int, default=1000, help="Combates por cruce de clases.")
+    parser.add_argument("--db", default="combates.db", help="Base de datos SQLite de destino.")
+    parser.add_argument("--batch", type=int, default=DEFAULT_BATCH_SIZE, help="Eventos por inserción.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    aggregators = [DamageByClass(), TimeToKill(), StrategyUsage()]
+    sink = SQLiteSink(args.db)
+    try:
+        processed = run_pipeline(simulated_events(args.fights, random.Random(args.seed)),
+                                 aggregators, [sink], args.batch)
+    finally:
+        sink.close()
+    for aggregator in aggregators:
+        print(aggregator.report())
+    print(summarize(args.db))
+    print(f"{processed} eventos guardados en {args.db}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 Define la interfaz de Comando y los comandos concretos para las acciones del jugador.
 """
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Dict, Type
+from typing import TYPE_CHECKING, Dict, List, Tuple, Type
 
 from game.strategies import CombatStrategy, AggressiveStrategy, DefensiveStrategy, SpellCastingStrategy
 from game.constants import DIRECTIONS, STRATEGY_NAMES
@@ -12,7 +12,51 @@ from typing import Optional
 if TYPE_CHECKING:
     from game.characters import Character
 
+# Atributos de un personaje que un comando puede modificar y que se pueden deshacer
+TRACKED_ATTRIBUTES: Tuple[str, ...] = (
+    "health", "mana", "is_furious", "furia_turns_left", "combat_strategy", "weapon", "armor"
+)
+_MISSING = object() # Marca atributos que el personaje no tiene (ej. 'mana' en un Guerrero)
+
+
+class StateDelta:
+    """
+    Cambios mínimos que un comando produjo sobre los personajes involucrados.
+    Solo guarda los atributos que realmente cambiaron, como pares (antes, después),
+    por lo que deshacer un comando cuesta O(cambios) y no una copia completa del estado.
+    """
+    def __init__(self):
+        self.changes: List[Tuple['Character', str, object, object]] = []
+
+    @staticmethod
+    def capture(characters: List['Character']) -> List[Tuple['Character', Tuple[object, ...]]]:
+        return [(character, tuple(getattr(character, attr, _MISSING) for attr in TRACKED_ATTRIBUTES))
+                for character in characters]
+
+    @classmethod
+    def diff(cls, before: List[Tuple['Character', Tuple[object, ...]]]) -> 'StateDelta':
+        delta = cls()
+        for character, old_values in before:
+            for attr, old_value in zip(TRACKED_ATTRIBUTES, old_values):
+                new_value = getattr(character, attr, _MISSING)
+                if new_value is not old_value and new_value != old_value:
+                    delta.changes.append((character, attr, old_value, new_value))
+        return delta
+
+    def revert(self):
+        for character, attr, old_value, _ in reversed(self.changes):
+            if old_value is _MISSING:
+                delattr(character, attr)
+            else:
+                setattr(character, attr, old_value)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+
 class Command(ABC):
+    delta: Optional[StateDelta] = None # Se llena cuando el comando se ejecuta a través de CommandHistory
+
     @abstractmethod
     def execute(self) -> str:
         """
@@ -21,6 +65,18 @@ class Command(ABC):
         """
         pass
 
+    def participants(self) -> List['Character']:
+        """Personajes cuyo estado puede cambiar al ejecutar el comando."""
+        return []
+
+    def undo(self) -> bool:
+        """Revierte los cambios del comando. Retorna False si no hay nada que deshacer."""
+        if self.delta is None:
+            return False
+        self.delta.revert()
+        self.delta = None
+        return True
+
 class LookCommand(Command):
     def __init__(self, actor: 'Character', target: Optional['Character'] = None):
         self.actor = actor
@@ -46,6 +102,9 @@ class AttackCommand(Command):
             return f"{self.target.name} ya está derrotado. No tiene sentido atacar."
         return self.attacker.perform_combat_action(self.target)
 
+    def participants(self) -> List['Character']:
+        return [self.attacker, self.target]
+
 
 class MoveCommand(Command): # Sin cambios funcionales mayores
     def __init__(self, actor: 'Character', direction: str):
@@ -82,6 +141,9 @@ class ChangeStrategyCommand(Command):
             available_strats = ", ".join(self.STRATEGY_CLASSES.keys())
             return f"Estrategia '{self.new_strategy_name}' desconocida. Disponibles: {available_strats}."
 
+    def participants(self) -> List['Character']:
+        return [self.actor]
+
 
 class SpecialAbilityCommand(Command):
     def __init__(self, actor: 'Character', target: Optional['Character'] = None):
@@ -93,7 +155,85 @@ class SpecialAbilityCommand(Command):
             return f"{self.actor.name} no puede usar su habilidad, está derrotado."
         return self.actor.use_special_ability(self.target)
 
+    def participants(self) -> List['Character']:
+        return [self.actor, self.target] if self.target else [self.actor]
+
+
+class TickEffectsCommand(Command):
+    """Actualiza los efectos temporales (ej. Furia) al final del turno de un personaje."""
+    def __init__(self, actor: 'Character'):
+        self.actor = actor
+
+    def execute(self) -> str:
+        self.actor.tick_effects()
+        return ""
+
+    def participants(self) -> List['Character']:
+        return [self.actor]
+
 
 class QuitCommand(Command):
     def execute(self) -> str:
-        return "salir_command_signal"
\ No newline at end of file
+        return "salir_command_signal"
+
+
+class CommandHistory:
+    """
+    Historial de comandos agrupados por turnos. Cada comando ejecutado a través del
+    historial guarda su StateDelta, lo que permite deshacer comandos o rebobinar turnos
+    completos, y también explorar ramas alternativas ("¿qué pasaría si...?")
+    rebobinando y ejecutando otra secuencia de comandos.
+    """
+    def __init__(self):
+        self._turns: List[List[Command]] = []
+        self._current_turn: List[Command] = []
+
+    def execute(self, command: Command) -> str:
+        before = StateDelta.capture(command.participants())
+        result = command.execute()
+        command.delta = StateDelta.diff(before)
+        self._current_turn.append(command)
+        return result
+
+    def end_turn(self):
+        if self._current_turn:
+            self._turns.append(self._current_turn)
+            self._current_turn = []
+
+    def undo(self) -> bool:
+        """Deshace el último comando ejecutado."""
+        if not self._current_turn:
+            if not self._turns:
+                return False
+            self._current_turn = self._turns.pop()
+        return self._current_turn.pop().undo()
+
+    def rewind(self, turns: int = 1) -> int:
+        """Deshace los últimos `turns` turnos completos. Retorna cuántos turnos se deshicieron."""
+        self.end_turn()
+        rewound = 0
+        while rewound < turns and self._turns:
+            for command in reversed(self._turns.pop()):
+                command.undo()
+            rewound += 1
+        return rewound
+
+    def clear(self):
+        self._turns.clear()
+        self._current_turn = []
+
+    def __len__(self) -> int:
+        return len(self._turns) + (1 if self._current_turn else 0)
+
+
+class RewindCommand(Command):
+    """Rebobina los últimos turnos. No se registra en el historial."""
+    def __init__(self, history: CommandHistory, turns: int = 1):
+        self.history = history
+        self.turns = turns
+
+    def execute(self) -> str:
+        rewound = self.history.rewind(self.turns)
+        if rewound == 0:
+            return "No hay turnos que deshacer."
+        return f"Se deshicieron {rewound} turno(s). El tiempo retrocede..."
\ No newline at end of file
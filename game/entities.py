@@ -0,0 +1,294 @@
+# game/entities.py
+"""
+Almacén de entidades basado en arreglos para mundos con muchísimas unidades.
+El estado numérico de cada combatiente vive en arreglos tipados contiguos indexados
+por id de entidad; las armas, armaduras y estrategias sin estado se comparten (Flyweight).
+Los ids se reutilizan, así que cada hueco lleva una generación: una vista de una
+entidad dada de baja deja de ser válida aunque otra ocupe su lugar.
+Las vistas (EntityView) son instancias de la clase de personaje real (Warrior, Mage...),
+así que perform_combat_action, describe() e isinstance siguen funcionando, y los
+sistemas (regeneración, efectos, limpieza de derrotados) recorren los arreglos en bloque.
+"""
+from array import array
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple, Type
+
+from game.characters import Character
+from game.factories import CharacterEquipmentFactory
+from game.items import Weapon, Armor
+from game.rules import RuleStrategy
+from game.strategies import CombatStrategy, AggressiveStrategy, DefensiveStrategy, SpellCastingStrategy
+
+_NONE = -1 # Valor centinela para atributos opcionales (maná, sigilo) que la clase no tiene
+
+# Estrategias que no guardan estado por entidad y por lo tanto se pueden compartir.
+# Se compara la clase exacta: una subclase podría añadir estado propio.
+SHAREABLE_STRATEGIES: Tuple[Type[CombatStrategy], ...] = (
+    AggressiveStrategy, DefensiveStrategy, SpellCastingStrategy, RuleStrategy,
+)
+
+
+class EntityStore:
+    def __init__(self):
+        self.health = array('i')
+        self.max_health = array('i')
+        self.mana = array('i')
+        self.max_mana = array('i')
+        self.stealth_points = array('i')
+        self.is_furious = array('b')
+        self.furia_turns_left = array('i')
+        self.live = array('b')
+        self.generations = array('I') # Se incrementa en cada baja para invalidar vistas viejas
+        self.kind_ids = array('H')
+        self.weapon_ids = array('H')
+        self.armor_ids = array('H')
+        self.names: List[str] = []
+        self.strategies: List[CombatStrategy] = []
+
+        self._kinds: List[Type[Character]] = []
+        self._kind_index: Dict[Type[Character], int] = {}
+        self._weapons: List[Weapon] = []
+        self._armors: List[Armor] = []
+        self._item_index: Dict[Tuple[type, str], int] = {}
+        self._strategy_index: Dict[Hashable, CombatStrategy] = {}
+        self._free_ids: List[int] = []
+
+    # --- Tablas compartidas (Flyweight) ---
+    def _intern(self, table: list, item) -> int:
+        key = (type(item), item.get_name())
+        index = self._item_index.get(key)
+        if index is None:
+            index = len(table)
+            table.append(item)
+            self._item_index[key] = index
+        return index
+
+    def intern_strategy(self, strategy: Optional[CombatStrategy]) -> Optional[CombatStrategy]:
+        """
+        Retorna una instancia compartida equivalente (misma clase y mismos atributos) si la
+        estrategia es de SHAREABLE_STRATEGIES; cualquier otra conserva su propia instancia.
+        """
+        if type(strategy) not in SHAREABLE_STRATEGIES:
+            return strategy
+        key = (type(strategy), tuple(sorted(vars(strategy).items())))
+        return self._strategy_index.setdefault(key, strategy)
+
+    def _kind_id(self, kind: Type[Character]) -> int:
+        index = self._kind_index.get(kind)
+        if index is None:
+            index = len(self._kinds)
+            self._kinds.append(kind)
+            self._kind_index[kind] = index
+        return index
+
+    def kind_of(self, entity_id: int) -> Type[Character]:
+        return self._kinds[self.kind_ids[entity_id]]
+
+    def weapon_of(self, entity_id: int) -> Weapon:
+        return self._weapons[self.weapon_ids[entity_id]]
+
+    def armor_of(self, entity_id: int) -> Armor:
+        return self._armors[self.armor_ids[entity_id]]
+
+    def set_weapon(self, entity_id: int, weapon: Weapon):
+        self.weapon_ids[entity_id] = self._intern(self._weapons, weapon)
+
+    def set_armor(self, entity_id: int, armor: Armor):
+        self.armor_ids[entity_id] = self._intern(self._armors, armor)
+
+    # --- Altas y bajas ---
+    def add(self, character: Character) -> int:
+        """Copia el estado de un Character al almacén y retorna el id de la nueva entidad."""
+        weapon_id = self._intern(self._weapons, character.weapon)
+        armor_id = self._intern(self._armors, character.armor)
+        strategy = self.intern_strategy(character.combat_strategy)
+        row = (
+            (self.health, character.health),
+            (self.max_health, character.max_health),
+            (self.mana, getattr(character, 'mana', _NONE)),
+            (self.max_mana, getattr(character, 'max_mana', _NONE)),
+            (self.stealth_points, getattr(character, 'stealth_points', _NONE)),
+            (self.is_furious, int(character.is_furious)),
+            (self.furia_turns_left, character.furia_turns_left),
+            (self.live, 1),
+            (self.kind_ids, self._kind_id(type(character))),
+            (self.weapon_ids, weapon_id),
+            (self.armor_ids, armor_id),
+        )
+        if self._free_ids:
+            entity_id = self._free_ids.pop()
+            for column, value in row:
+                column[entity_id] = value
+            self.names[entity_id] = character.name
+            self.strategies[entity_id] = strategy
+        else:
+            entity_id = len(self.live)
+            for column, value in row:
+                column.append(value)
+            self.generations.append(0)
+            self.names.append(character.name)
+            self.strategies.append(strategy)
+        return entity_id
+
+    def spawn(self, factory: CharacterEquipmentFactory, name: str) -> int:
+        return self.add(factory.create_character(name))
+
+    def despawn(self, entity_id: int):
+        if self.live[entity_id]:
+            self.live[entity_id] = 0
+            self.generations[entity_id] += 1
+            self.strategies[entity_id] = None # Libera la referencia; el hueco se reutiliza
+            self._free_ids.append(entity_id)
+
+    def is_live(self, entity_id: int) -> bool:
+        return 0 <= entity_id < len(self.live) and bool(self.live[entity_id])
+
+    def __len__(self) -> int:
+        return len(self.live) - len(self._free_ids)
+
+    def ids(self) -> Iterator[int]:
+        live = self.live
+        return (entity_id for entity_id in range(len(live)) if live[entity_id])
+
+    def view(self, entity_id: int) -> 'EntityView':
+        if not self.is_live(entity_id):
+            raise KeyError(f"La entidad {entity_id} no existe en el almacén.")
+        return _view_class_for(self.kind_of(entity_id))(self, entity_id)
+
+    def views(self) -> Iterator['EntityView']:
+        return (self.view(entity_id) for entity_id in self.ids())
+
+    # --- Sistemas (pasadas en bloque sobre los arreglos) ---
+    def regenerate(self, health: int = 0, mana: int = 0):
+        """Regenera salud a las entidades vivas y maná a las que lo tienen, sin exceder el máximo."""
+        live, hp, max_hp, mp, max_mp = self.live, self.health, self.max_health, self.mana, self.max_mana
+        for entity_id in range(len(live)):
+            if not live[entity_id] or hp[entity_id] <= 0:
+                continue
+            if health:
+                hp[entity_id] = min(hp[entity_id] + health, max_hp[entity_id])
+            if mana and max_mp[entity_id] != _NONE:
+                mp[entity_id] = min(mp[entity_id] + mana, max_mp[entity_id])
+
+    def tick_effects(self):
+        """Equivalente en bloque de Character.tick_effects para todas las entidades."""
+        live, furious, turns = self.live, self.is_furious, self.furia_turns_left
+        for entity_id in range(len(live)):
+            if live[entity_id] and furious[entity_id]:
+                turns[entity_id] -= 1
+                if turns[entity_id] <= 0:
+                    furious[entity_id] = 0
+
+    def cleanup_dead(self) -> List[int]:
+        """Da de baja a las entidades derrotadas y retorna sus ids."""
+        live, hp = self.live, self.health
+        dead = [entity_id for entity_id in range(len(live)) if live[entity_id] and hp[entity_id] <= 0]
+        for entity_id in dead:
+            self.despawn(entity_id)
+        return dead
+
+
+class EntityView(Character):
+    """
+    Vista delgada sobre una fila del EntityStore compatible con Character.
+    No llama a Character.__init__: cada atributo es una propiedad que lee o escribe
+    los arreglos, así que los métodos heredados (take_damage, heal, describe...) funcionan tal cual.
+    El arma y la armadura se leen de las tablas compartidas en cada uso, así que un cambio en
+    los valores de los ítems (ej. Sword.ATTACK_BONUS) se ve igual que con un Character.
+    """
+    def __init__(self, store: EntityStore, entity_id: int):
+        self._store = store
+        self.entity_id = entity_id
+        self._generation = store.generations[entity_id]
+
+    def _slot(self) -> int:
+        """Id de la entidad, comprobando que la vista no apunte a un hueco reutilizado."""
+        if self._store.generations[self.entity_id] != self._generation:
+            raise KeyError(f"La entidad {self.entity_id} fue dada de baja; la vista ya no es válida.")
+        return self.entity_id
+
+    def _int_property(column: str):
+        def getter(self) -> int:
+            return getattr(self._store, column)[self._slot()]
+        def setter(self, value: int):
+            getattr(self._store, column)[self._slot()] = value
+        return property(getter, setter)
+
+    def _optional_property(column: str):
+        def getter(self) -> int:
+            value = getattr(self._store, column)[self._slot()]
+            if value == _NONE:
+                raise AttributeError(column) # Mantiene hasattr(actor, 'mana') == False para no lanzadores
+            return value
+        def setter(self, value: int):
+            getattr(self._store, column)[self._slot()] = value
+        return property(getter, setter)
+
+    health = _int_property('health')
+    max_health = _int_property('max_health')
+    furia_turns_left = _int_property('furia_turns_left')
+    mana = _optional_property('mana')
+    max_mana = _optional_property('max_mana')
+    stealth_points = _optional_property('stealth_points')
+    del _int_property, _optional_property
+
+    @property
+    def is_furious(self) -> bool:
+        return bool(self._store.is_furious[self._slot()])
+
+    @is_furious.setter
+    def is_furious(self, value: bool):
+        self._store.is_furious[self._slot()] = int(value)
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._slot()]
+
+    @name.setter
+    def name(self, value: str):
+        self._store.names[self._slot()] = value
+
+    @property
+    def weapon(self) -> Weapon:
+        return self._store.weapon_of(self._slot())
+
+    @weapon.setter
+    def weapon(self, value: Weapon):
+        self._store.set_weapon(self._slot(), value)
+
+    @property
+    def armor(self) -> Armor:
+        return self._store.armor_of(self._slot())
+
+    @armor.setter
+    def armor(self, value: Armor):
+        self._store.set_armor(self._slot(), value)
+
+    @property
+    def combat_strategy(self) -> Optional[CombatStrategy]:
+        return self._store.strategies[self._slot()]
+
+    @combat_strategy.setter
+    def combat_strategy(self, value: CombatStrategy):
+        self._store.strategies[self._slot()] = self._store.intern_strategy(value)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, EntityView) and other._store is self._store
+                and other.entity_id == self.entity_id and other._generation == self._generation)
+
+    def __hash__(self) -> int:
+        return hash((id(self._store), self.entity_id, self._generation))
+
+
+_VIEW_CLASSES: Dict[Type[Character], Type[EntityView]] = {}
+
+def _view_class_for(kind: Type[Character]) -> Type[EntityView]:
+    """
+    Crea (una sola vez por clase) una subclase de EntityView y de la clase de personaje,
+    con el mismo nombre, para que describe(), las habilidades e isinstance(vista, Warrior)
+    se comporten igual que con el Character original.
+    """
+    view_class = _VIEW_CLASSES.get(kind)
+    if view_class is None:
+        view_class = type(kind.__name__, (EntityView, kind), {})
+        _VIEW_CLASSES[kind] = view_class
+    return view_class
@@ -27,62 +27,74 @@ class Armor(ItemEnhancement):
 
 # --- Productos Concretos: Armas ---
 class Sword(Weapon):
+    ATTACK_BONUS = 5
+
     def get_name(self) -> str:
         return "Espada"
 
     def attack_bonus(self) -> int:
-        return 5
+        return self.ATTACK_BONUS
 
     def get_description(self) -> str:
         return "Una espada afilada y confiable."
 
 class Staff(Weapon):
+    ATTACK_BONUS = 3
+
     def get_name(self) -> str:
         return "Vara"
 
     def attack_bonus(self) -> int:
-        return 3
+        return self.ATTACK_BONUS
 
     def get_description(self) -> str:
         return "Una vara de madera nudosa, ideal para canalizar energías."
 
 class Dagger(Weapon):
+    ATTACK_BONUS = 2
+
     def get_name(self) -> str:
         return "Daga"
 
     def attack_bonus(self) -> int:
-        return 2
+        return self.ATTACK_BONUS
 
     def get_description(self) -> str:
         return "Una daga corta y sigilosa, perfecta para ataques rápidos."
 
 # --- Productos Concretos: Armaduras ---
 class Chainmail(Armor):
+    DEFENSE_BONUS = 10
+
     def get_name(self) -> str:
         return "Cota de Mallas"
 
     def defense_bonus(self) -> int:
-        return 10
+        return self.DEFENSE_BONUS
 
     def get_description(self) -> str:
         return "Una cota de mallas resistente que ofrece buena protección."
 
 class Robe(Armor):
+    DEFENSE_BONUS = 3
+
     def get_name(self) -> str:
         return "Túnica"
 
     def defense_bonus(self) -> int:
-        return 3
+        return self.DEFENSE_BONUS
 
     def get_description(self) -> str:
         return "Una túnica ligera, ofrece poca protección física pero no estorba."
 
 class LeatherArmor(Armor):
+    DEFENSE_BONUS = 6
+
     def get_name(self) -> str:
         return "Armadura de Cuero"
 
     def defense_bonus(self) -> int:
-        return 6
+        return self.DEFENSE_BONUS
 
     def get_description(self) -> str:
         return "Una armadura de cuero curtido, balance entre movilidad y protección."
@@ -108,31 +120,37 @@ class WeaponDecorator(Weapon, ABC):
 
 # --- Decoradores Concretos para Armas ---
 class FireEnchantment(WeaponDecorator):
+    BONUS = 3
+
     def get_name(self) -> str:
         return f"{self._decorated_weapon.get_name()} de Fuego"
 
     def attack_bonus(self) -> int:
-        return self._decorated_weapon.attack_bonus() + 3
+        return self._decorated_weapon.attack_bonus() + self.BONUS
 
     def get_description(self) -> str:
         return f"{self._decorated_weapon.get_description()} Ahora emite un calor abrasador y añade daño de fuego."
 
 class PoisonEnchantment(WeaponDecorator):
+    BONUS = 1
+
     def get_name(self) -> str:
         return f"{self._decorated_weapon.get_name()} Venenosa"
 
     def attack_bonus(self) -> int:
-        return self._decorated_weapon.attack_bonus() + 1 # Podría aplicar un estado "envenenado" en un futuro.
+        return self._decorated_weapon.attack_bonus() + self.BONUS # Podría aplicar un estado "envenenado" en un futuro.
 
     def get_description(self) -> str:
         return f"{self._decorated_weapon.get_description()} Está cubierta de una sustancia tóxica."
 
 class VorpalEnchantment(WeaponDecorator):
+    BONUS = 10
+
     def get_name(self) -> str:
         return f"{self._decorated_weapon.get_name()} Aniquiladora (Vorpal)"
 
     def attack_bonus(self) -> int:
-        return self._decorated_weapon.attack_bonus() + 10
+        return self._decorated_weapon.attack_bonus() + self.BONUS
 
     def get_description(self) -> str:
         return f"{self._decorated_weapon.get_description()} Susurros de poder emanan de esta hoja, ¡capaz de decapitar con un golpe de suerte!"
\ No newline at end of file
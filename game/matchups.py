@@ -0,0 +1,331 @@
+# game/matchups.py
+"""
+Matriz de enfrentamientos: cada fila es una combinación clase × estrategia × encantamiento
+y cada columna una clase rival con su equipo por defecto. Cada celda se guarda en disco
+con una clave que es el hash de exactamente lo que esa celda usa (constantes, código y
+valores de sus ítems, estrategias y clases, y parámetros de simulación). Tras cambiar
+una constante o un ítem solo se recalculan las celdas afectadas. Las constantes de módulo
+que usa cada clase se obtienen de los nombres que leen sus métodos, no de una lista a mano.
+
+Uso:
+    python -m game.matchups --fights 200 --workers 4
+    python -m game.matchups --check-keys # Comprueba qué celdas invalida cada parámetro
+"""
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import random
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from types import CodeType
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from game import simulation
+from game.characters import Character
+from game.commands import ChangeStrategyCommand
+from game.items import Sword, WeaponDecorator, FireEnchantment, PoisonEnchantment, VorpalEnchantment
+from game.simulation import CLASS_FACTORIES, DEFAULT_ABILITY_CHANCE, DEFAULT_MAX_TURNS, simulate_fight
+from game.strategies import SpellCastingStrategy
+from game.tuning import PARAMETERS, apply_config
+
+CACHE_VERSION = 1 # Subirlo invalida todas las celdas guardadas
+DEFAULT_CACHE_DIR = Path(".matchup_cache")
+
+STRATEGIES = ChangeStrategyCommand.STRATEGY_CLASSES
+ENCHANTMENTS: Dict[str, Optional[Type[WeaponDecorator]]] = {
+    "ninguno": None,
+    "fuego": FireEnchantment,
+    "veneno": PoisonEnchantment,
+    "vorpal": VorpalEnchantment,
+}
+
+class Loadout(NamedTuple):
+    class_name: str
+    strategy: Optional[str] = None # None = estrategia por defecto de la clase
+    enchantment: str = "ninguno"
+
+    def label(self) -> str:
+        return f"{self.class_name}/{self.strategy or 'defecto'}/{self.enchantment}"
+
+    def build(self) -> Character:
+        character = CLASS_FACTORIES[self.class_name]().create_character(self.class_name)
+        if self.strategy is not None:
+            character.set_combat_strategy(STRATEGIES[self.strategy]())
+        enchantment = ENCHANTMENTS[self.enchantment]
+        if enchantment is not None:
+            character.weapon = enchantment(character.weapon)
+        return character
+
+
+class Cell(NamedTuple):
+    row: Loadout
+    opponent: Loadout
+    fights: int
+    seed: int
+    ability_chance: float = DEFAULT_ABILITY_CHANCE
+    max_turns: int = DEFAULT_MAX_TURNS
+
+
+class CellResult(NamedTuple):
+    wins: int
+    losses: int
+    draws: int
+
+    def win_rate(self) -> float:
+        total = self.wins + self.losses + self.draws
+        return (self.wins + self.draws / 2) / total if total else 0.0
+
+
+@lru_cache(maxsize=None)
+def _source(obj) -> str:
+    return inspect.getsource(obj)
+
+
+def _code_names(code: CodeType) -> Iterator[str]:
+    """Nombres que lee el código, incluidos los de funciones y comprensiones anidadas."""
+    yield from code.co_names
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            yield from _code_names(const)
+
+
+def _module_constants(klass: type) -> Dict[str, object]:
+    """
+    Valores actuales de las constantes de módulo (ej. BASE_PLAYER_HEALTH en game.characters)
+    que leen los métodos de la clase. Se resuelven en los globals de cada método, que es
+    donde las busca Python al ejecutarlo, así que también ven los cambios de tuning.
+    Incluye los valores por defecto de los parámetros (ej. max_health=BASE_PLAYER_HEALTH),
+    que se fijan al definir el método y no aparecen entre los nombres que lee.
+    """
+    constants = {}
+    for value in vars(klass).values():
+        if isinstance(value, property):
+            functions = [value.fget, value.fset]
+        else:
+            functions = [getattr(value, '__func__', value)] # Desenvuelve classmethod/staticmethod
+        for function in functions:
+            code = getattr(function, '__code__', None)
+            if code is None:
+                continue
+            defaults = [default for default in function.__defaults__ or ()
+                        if isinstance(default, (int, float, str))]
+            if defaults:
+                constants[f"{function.__name__}()"] = defaults
+            namespace = function.__globals__
+            for name in _code_names(code):
+                constant = namespace.get(name)
+                if name.isupper() and isinstance(constant, (int, float, str)):
+                    constants[name] = constant
+    return constants
+
+
+def _class_fingerprint(klass: type) -> Dict[str, object]:
+    """
+    Código de la clase (y sus ancestros del juego) más sus constantes de clase y las
+    constantes de módulo que usan sus métodos, con sus valores actuales.
+    """
+    fingerprint = {}
+    for ancestor in klass.__mro__:
+        if ancestor.__module__.startswith("game."):
+            constants = {attr: value for attr, value in vars(ancestor).items()
+                         if attr.isupper() and isinstance(value, (int, float, str))}
+            fingerprint[ancestor.__qualname__] = [_source(ancestor), constants, _module_constants(ancestor)]
+    return fingerprint
+
+
+def _weapon_classes(character: Character) -> List[type]:
+    """Clases de los decoradores del arma, de afuera hacia adentro, y la del arma base."""
+    weapon_classes = []
+    weapon = character.weapon
+    while isinstance(weapon, WeaponDecorator):
+        weapon_classes.append(type(weapon))
+        weapon = weapon._decorated_weapon
+    weapon_classes.append(type(weapon))
+    return weapon_classes
+
+
+def _loadout_dependencies(loadout: Loadout) -> Dict[str, object]:
+    character = loadout.build()
+    weapon_classes = _weapon_classes(character)
+    return {
+        "class": _class_fingerprint(type(character)),
+        "factory": _class_fingerprint(CLASS_FACTORIES[loadout.class_name]),
+        "weapon": [_class_fingerprint(klass) for klass in weapon_classes],
+        "armor": _class_fingerprint(type(character.armor)),
+        "strategy": _class_fingerprint(type(character.combat_strategy)),
+    }
+
+
+def cell_key(cell: Cell) -> str:
+    """Hash de todo lo que influye en el resultado de la celda, y nada más."""
+    dependencies = {
+        "version": CACHE_VERSION,
+        "cell": [cell.row, cell.opponent, cell.fights, cell.seed, cell.ability_chance, cell.max_turns],
+        "row": _loadout_dependencies(cell.row),
+        "opponent": _loadout_dependencies(cell.opponent),
+        # Cómo se arma y se simula la celda en este módulo; cambiarlo también invalida el caché
+        "cache": [_source(Loadout), _source(compute_cell)],
+        # La política simulada solo consulta SPELL_COST para decidir cuándo recuperar maná; el resto
+        # de SpellCastingStrategy ya entra por la "strategy" de cada lado cuando se usa
+        "simulation": [_source(simulation), SpellCastingStrategy.SPELL_COST],
+    }
+    payload = json.dumps(dependencies, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compute_cell(cell: Cell) -> CellResult:
+    # La semilla depende solo de la celda, así que recalcular da el mismo resultado que el caché
+    rng = random.Random(zlib.crc32(f"{cell.row.label()}|{cell.opponent.label()}".encode()) ^ cell.seed)
+    wins = losses = draws = 0
+    for _ in range(cell.fights):
+        result = simulate_fight(cell.row.build(), cell.opponent.build(), rng, cell.ability_chance, cell.max_turns)
+        if result.winner == 0:
+            wins += 1
+        elif result.winner == 1:
+            losses += 1
+        else:
+            draws += 1
+    return CellResult(wins, losses, draws)
+
+
+class MatchupCache:
+    """Un archivo JSON por celda, nombrado por su clave."""
+    def __init__(self, directory: Path = DEFAULT_CACHE_DIR):
+        self.directory = Path(directory)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CellResult]:
+        try:
+            with open(self._path(key), encoding="utf-8") as cache_file:
+                return CellResult(*json.load(cache_file)["result"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None # Ausente o corrupto: se recalcula
+
+    def put(self, key: str, cell: Cell, result: CellResult):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"row": cell.row.label(), "opponent": cell.opponent.label(),
+                       "fights": cell.fights, "result": list(result)}, cache_file)
+        os.replace(tmp_path, path) # Escritura atómica
+
+
+def build_matrix(rows: Sequence[Loadout],
+                 opponents: Sequence[Loadout],
+                 fights: int,
+                 seed: int = 0,
+                 cache: Optional[MatchupCache] = None,
+                 workers: int = 1) -> Tuple[Dict[Tuple[Loadout, Loadout], CellResult], int]:
+    """
+    Retorna la matriz {(fila, rival): resultado} y cuántas celdas se recalcularon.
+    Las celdas cuya clave ya está en el caché no se simulan.
+    """
+    cache = cache or MatchupCache()
+    matrix: Dict[Tuple[Loadout, Loadout], CellResult] = {}
+    missing: List[Tuple[str, Cell]] = []
+    for row in rows:
+        for opponent in opponents:
+            cell = Cell(row, opponent, fights, seed)
+            key = cell_key(cell)
+            cached = cache.get(key)
+            if cached is None:
+                missing.append((key, cell))
+            else:
+                matrix[(row, opponent)] = cached
+
+    cells = [cell for _, cell in missing]
+    if workers > 1 and len(cells) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(compute_cell, cells, chunksize=max(1, len(cells) // (workers * 4))))
+    else:
+        results = [compute_cell(cell) for cell in cells]
+    for (key, cell), result in zip(missing, results):
+        cache.put(key, cell, result)
+        matrix[(cell.row, cell.opponent)] = result
+    return matrix, len(missing)
+
+
+# Parámetros de tuning -> qué lados de una celda dependen de él. check_key_scope verifica que
+# cambiar el parámetro invalide exactamente las celdas donde algún lado depende de él.
+KEY_SCOPE_CHECKS: Dict[str, Callable[[Loadout], bool]] = {
+    "SpellCastingStrategy.SPELL_DAMAGE": lambda loadout: isinstance(loadout.build().combat_strategy, SpellCastingStrategy),
+    "Sword.ATTACK_BONUS": lambda loadout: Sword in _weapon_classes(loadout.build()),
+}
+
+
+def _cell_label(cell: Cell) -> str:
+    return f"{cell.row.label()} vs {cell.opponent.label()}"
+
+
+def check_key_scope(rows: Sequence[Loadout], opponents: Sequence[Loadout],
+                    fights: int, seed: int = 0) -> List[str]:
+    """
+    Cambia cada parámetro de KEY_SCOPE_CHECKS y compara las claves de las celdas antes y
+    después. Retorna una línea por parámetro y los errores encontrados (celdas que se
+    recalcularían sin depender del parámetro, o que servirían resultados viejos del caché).
+    """
+    cells = [Cell(row, opponent, fights, seed) for row in rows for opponent in opponents]
+    keys = {cell: cell_key(cell) for cell in cells}
+    report, errors = [], []
+    for name, depends_on in KEY_SCOPE_CHECKS.items():
+        with apply_config({name: PARAMETERS[name].current() + 1}):
+            changed = {cell for cell in cells if cell_key(cell) != keys[cell]}
+        expected = {cell for cell in cells if depends_on(cell.row) or depends_on(cell.opponent)}
+        report.append(f"{name}: {len(changed)} de {len(cells)} celdas invalidadas (esperadas {len(expected)}).")
+        errors.extend(f"  {name} invalida {_cell_label(cell)} sin depender de él."
+                      for cell in sorted(changed - expected, key=_cell_label))
+        errors.extend(f"  {name} no invalida {_cell_label(cell)}, que depende de él."
+                      for cell in sorted(expected - changed, key=_cell_label))
+    return report + errors
+
+
+def format_matrix(matrix: Dict[Tuple[Loadout, Loadout], CellResult],
+                  rows: Sequence[Loadout],
+                  opponents: Sequence[Loadout]) -> str:
+    width = max(len(row.label()) for row in rows)
+    lines = [" " * width + "".join(f"{opponent.class_name:>10}" for opponent in opponents)]
+    for row in rows:
+        rates = "".join(f"{matrix[(row, opponent)].win_rate():>10.0%}" for opponent in opponents)
+        lines.append(f"{row.label():<{width}}{rates}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Calcula la matriz de enfrentamientos con caché por celda.")
+    parser.add_argument("--classes", nargs="+", choices=list(CLASS_FACTORIES), default=list(CLASS_FACTORIES))
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    parser.add_argument("--enchantments", nargs="+", choices=list(ENCHANTMENTS), default=list(ENCHANTMENTS))
+    parser.add_argument("--opponents", nargs="+", choices=list(CLASS_FACTORIES), default=list(CLASS_FACTORIES))
+    parser.add_argument("--fights", type=int, default=200, help="Combates por celda.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo.")
+    parser.add_argument("--cache-dir", type=Path, default=DEFAULT_CACHE_DIR)
+    parser.add_argument("--check-keys", action="store_true",
+                        help="Verifica que cada parámetro de tuning invalide solo las celdas que dependen de él.")
+    args = parser.parse_args(argv)
+
+    rows = [Loadout(class_name, strategy, enchantment)
+            for class_name in args.classes
+            for strategy in args.strategies
+            for enchantment in args.enchantments]
+    opponents = [Loadout(class_name) for class_name in args.opponents]
+    if args.check_keys:
+        lines = check_key_scope(rows, opponents, args.fights, args.seed)
+        print("\n".join(lines))
+        sys.exit(1 if len(lines) > len(KEY_SCOPE_CHECKS) else 0)
+    matrix, recomputed = build_matrix(rows, opponents, args.fights, args.seed,
+                                      MatchupCache(args.cache_dir), args.workers)
+    print(format_matrix(matrix, rows, opponents))
+    print(f"\n{recomputed} de {len(matrix)} celdas recalculadas; {len(matrix) - recomputed} desde el caché.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+# game/rules.py
+"""
+Lenguaje de reglas para describir el comportamiento de combate de los enemigos.
+Una regla se escribe como texto, por ejemplo:
+
+    "if mana >= 10 cast, else if hp < 30% defend, else attack"
+
+y se compila una sola vez en closures especializados, así que ejecutar la estrategia
+no parsea ni usa hasattr en cada turno: si una clase de personaje tiene maná se
+averigua la primera vez que aparece y se guarda por clase. El resultado es una
+CombatStrategy normal que se asigna con Character.set_combat_strategy; tras cada turno
+su last_action indica qué acción eligió la regla (attack, defend, cast o ability).
+"""
+import operator
+import re
+from functools import lru_cache
+from operator import attrgetter
+from typing import TYPE_CHECKING, Callable, Dict, List, Tuple
+
+from game.strategies import CombatStrategy, AggressiveStrategy, DefensiveStrategy, SpellCastingStrategy
+
+if TYPE_CHECKING:
+    from game.characters import Character
+
+Action = Callable[['Character', 'Character'], str]
+Decision = Callable[['Character', 'Character'], Tuple[str, str]] # -> (acción elegida, descripción)
+Condition = Callable[['Character', 'Character'], bool]
+
+# ¿Tiene la clase de personaje este atributo? Se resuelve una vez por (clase, atributo)
+_CLASS_HAS_ATTRIBUTE: Dict[Tuple[type, str], bool] = {}
+
+
+def _has_attribute(character: 'Character', attr: str) -> bool:
+    key = (character.__class__, attr)
+    present = _CLASS_HAS_ATTRIBUTE.get(key)
+    if present is None:
+        present = _CLASS_HAS_ATTRIBUTE[key] = hasattr(character, attr)
+    return present
+
+
+# Las estrategias existentes no guardan estado, así que se comparten entre todas las reglas
+_SPELLS = SpellCastingStrategy()
+_ACTIONS: Dict[str, Action] = {
+    "attack": AggressiveStrategy().execute_action,
+    "defend": DefensiveStrategy().execute_action,
+    "cast": lambda actor, target: _SPELLS.cast(actor, target, _has_attribute(actor, 'mana')),
+    "ability": lambda actor, target: actor.use_special_ability(target),
+}
+_ACTION_ALIASES: Dict[str, str] = {
+    "atacar": "attack",
+    "defender": "defend",
+    "hechizo": "cast",
+    "habilidad": "ability",
+}
+NO_ACTION = "none" # last_action cuando ninguna cláusula aplica
+
+# estadística -> (sobre quién, atributo, atributo máximo para porcentajes, ¿puede faltar?)
+_STATS: Dict[str, Tuple[str, str, str, bool]] = {
+    "hp": ("actor", "health", "max_health", False),
+    "mana": ("actor", "mana", "max_mana", True),
+    "fury": ("actor", "furia_turns_left", "", False),
+    "target_hp": ("target", "health", "max_health", False),
+}
+_STATS.update({
+    "salud": _STATS["hp"],
+    "furia": _STATS["fury"],
+    "objetivo_hp": _STATS["target_hp"],
+})
+
+_OPERATORS = {
+    ">=": operator.ge, "<=": operator.le, ">": operator.gt,
+    "<": operator.lt, "==": operator.eq, "!=": operator.ne,
+}
+
+_CLAUSE_RE = re.compile(r"^(?:(?P<else>else|si no)\s+)?(?:(?P<if>if|si)\s+(?P<cond>.+?)\s+)?(?P<action>\w+)$")
+_COMPARISON_RE = re.compile(r"^(?P<stat>\w+)\s*(?P<op>>=|<=|==|!=|>|<)\s*(?P<value>\d+)\s*(?P<percent>%?)$")
+
+
+class RuleSyntaxError(ValueError):
+    pass
+
+
+def _compile_comparison(text: str) -> Condition:
+    match = _COMPARISON_RE.match(text.strip())
+    if not match:
+        raise RuleSyntaxError(f"Condición inválida: '{text.strip()}'.")
+    stat = match.group("stat")
+    if stat not in _STATS:
+        raise RuleSyntaxError(f"Estadística desconocida: '{stat}'. Disponibles: {', '.join(_STATS)}.")
+    subject, attr, max_attr, optional = _STATS[stat]
+    compare = _OPERATORS[match.group("op")]
+    value = int(match.group("value"))
+    get = attrgetter(attr)
+
+    if match.group("percent"):
+        if not max_attr:
+            raise RuleSyntaxError(f"'{stat}' no admite porcentajes.")
+        get_max = attrgetter(max_attr)
+        def test(character: 'Character') -> bool:
+            return compare(get(character) * 100, value * get_max(character))
+    else:
+        def test(character: 'Character') -> bool:
+            return compare(get(character), value)
+
+    if optional:
+        # Personajes sin el atributo (ej. un Guerrero sin maná) simplemente no cumplen la condición
+        strict_test = test
+        def test(character: 'Character') -> bool:
+            return _has_attribute(character, attr) and strict_test(character)
+
+    if subject == "actor":
+        return lambda actor, target: test(actor)
+    return lambda actor, target: test(target)
+
+
+def _both(first: Condition, rest: Condition) -> Condition:
+    return lambda actor, target: first(actor, target) and rest(actor, target)
+
+
+def _branch(condition: Condition, action: Decision, otherwise: Decision) -> Decision:
+    return lambda actor, target: action(actor, target) if condition(actor, target) else otherwise(actor, target)
+
+
+def _compile_condition(text: str) -> Condition:
+    comparisons = [_compile_comparison(part) for part in re.split(r"\s+(?:and|y)\s+", text)]
+    condition = comparisons[-1]
+    for previous in reversed(comparisons[:-1]):
+        condition = _both(previous, condition)
+    return condition
+
+
+def _named(name: str, action: Action) -> Decision:
+    return lambda actor, target: (name, action(actor, target))
+
+
+def _no_rule_matched(actor: 'Character', target: 'Character') -> Tuple[str, str]:
+    return NO_ACTION, f"{actor.name} no sabe cómo actuar en combate (ninguna regla aplica)."
+
+
+@lru_cache(maxsize=None)
+def compile_rules(source: str) -> Decision:
+    """
+    Compila el texto de reglas a una función (actor, target) -> (acción, descripción).
+    El resultado se cachea por texto, así que cientos de enemigos con el mismo
+    comportamiento comparten los mismos closures.
+    """
+    clauses: List[Tuple[Condition, Decision]] = []
+    default: Decision = _no_rule_matched
+    parts = [part.strip() for part in re.split(r"[,;\n]", source.lower()) if part.strip()]
+    if not parts:
+        raise RuleSyntaxError("La regla está vacía.")
+
+    for index, part in enumerate(parts):
+        match = _CLAUSE_RE.match(part)
+        if not match:
+            raise RuleSyntaxError(f"Cláusula inválida: '{part}'.")
+        if index == 0 and match.group("else") is not None:
+            raise RuleSyntaxError(f"La primera cláusula no puede empezar con 'else': '{part}'.")
+        if index > 0 and match.group("else") is None:
+            raise RuleSyntaxError(f"Las cláusulas después de la primera deben empezar con 'else': '{part}'.")
+        action_name = _ACTION_ALIASES.get(match.group("action"), match.group("action"))
+        if action_name not in _ACTIONS:
+            raise RuleSyntaxError(f"Acción desconocida: '{match.group('action')}'. "
+                                  f"Disponibles: {', '.join(list(_ACTIONS) + list(_ACTION_ALIASES))}.")
+        action = _named(action_name, _ACTIONS[action_name])
+
+        if match.group("if") is None:
+            if index != len(parts) - 1:
+                raise RuleSyntaxError(f"La cláusula sin condición debe ser la última: '{part}'.")
+            default = action
+        else:
+            clauses.append((_compile_condition(match.group("cond")), action))
+
+    # Encadena las cláusulas de atrás hacia adelante: cada paso solo conoce su condición,
+    # su acción y el siguiente paso ya compilado.
+    decide = default
+    for condition, action in reversed(clauses):
+        decide = _branch(condition, action, decide)
+    return decide
+
+
+class RuleStrategy(CombatStrategy):
+    def __init__(self, source: str):
+        self.source = source
+        self._decide = compile_rules(source)
+        # Acción que eligió la regla en la última ejecución. Se lee justo después de
+        # execute_action, así que sirve aunque la instancia se comparta entre entidades.
+        self.last_action = NO_ACTION
+
+    def execute_action(self, actor: 'Character', target: 'Character') -> str:
+        self.last_action, description = self._decide(actor, target)
+        return description
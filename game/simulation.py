@@ -0,0 +1,117 @@
+# game/simulation.py
+"""
+Simulación de combates sin interfaz, para balancear el juego.
+Reproduce el orden de turnos de main.py (acción y luego tick_effects) entre dos
+personajes controlados por una política sencilla en lugar de un jugador humano.
+"""
+import random
+from typing import Dict, Generator, NamedTuple, Optional, Tuple, Type
+
+from game.characters import Character
+from game.factories import CharacterEquipmentFactory, WarriorFactory, MageFactory, RogueFactory
+from game.strategies import SpellCastingStrategy
+
+CLASS_FACTORIES: Dict[str, Type[CharacterEquipmentFactory]] = {
+    "Warrior": WarriorFactory,
+    "Mage": MageFactory,
+    "Rogue": RogueFactory,
+}
+DEFAULT_ABILITY_CHANCE = 0.2 # Probabilidad de usar la habilidad especial en un turno
+DEFAULT_MAX_TURNS = 200 # Tope de turnos; al alcanzarlo el combate es empate
+
+
+class FightResult(NamedTuple):
+    winner: Optional[int] # 0 o 1 según el orden de los personajes recibidos; None si es empate
+    turns: int
+
+
+class TurnRecord(NamedTuple):
+    turn: int
+    actor: Character
+    target: Character
+    action: str # Nombre de la habilidad especial o de la estrategia de combate usada
+    damage: int # Salud que perdió el objetivo
+
+
+def wants_ability(actor: Character, rng: random.Random, ability_chance: float) -> bool:
+    """
+    Política simple de un combatiente: recupera maná cuando no le alcanza para un hechizo,
+    usa su habilidad especial con cierta probabilidad y si no aplica su estrategia de combate.
+    """
+    if getattr(actor, 'mana', SpellCastingStrategy.SPELL_COST) < SpellCastingStrategy.SPELL_COST:
+        return True
+    return rng.random() < ability_chance
+
+
+def iter_fight(first: Character,
+               second: Character,
+               rng: random.Random,
+               ability_chance: float = DEFAULT_ABILITY_CHANCE,
+               max_turns: int = DEFAULT_MAX_TURNS) -> Generator[TurnRecord, None, FightResult]:
+    """
+    Combate hasta que uno caiga o se alcance max_turns. La iniciativa se sortea.
+    Produce un TurnRecord por turno y retorna el FightResult al terminar.
+    """
+    fighters = (first, second)
+    current = rng.randrange(2)
+    for turn in range(1, max_turns + 1):
+        actor, target = fighters[current], fighters[1 - current]
+        health_before = target.health
+        if wants_ability(actor, rng, ability_chance):
+            actor.use_special_ability(target)
+            action = actor.special_ability_name()
+        else:
+            actor.perform_combat_action(target)
+            action = actor.combat_strategy.__class__.__name__
+        actor.tick_effects()
+        yield TurnRecord(turn, actor, target, action, health_before - target.health)
+        if not target.is_alive():
+            return FightResult(winner=current, turns=turn)
+        current = 1 - current
+    return FightResult(winner=None, turns=max_turns)
+
+
+def simulate_fight(first: Character,
+                   second: Character,
+                   rng: random.Random,
+                   ability_chance: float = DEFAULT_ABILITY_CHANCE,
+                   max_turns: int = DEFAULT_MAX_TURNS) -> FightResult:
+    """
+    Igual que iter_fight pero sin construir un TurnRecord por turno: es el bucle
+    que usan tuning y matchups, así que se mantiene lo más simple posible.
+    """
+    fighters = (first, second)
+    current = rng.randrange(2)
+    for turn in range(1, max_turns + 1):
+        actor, target = fighters[current], fighters[1 - current]
+        if wants_ability(actor, rng, ability_chance):
+            actor.use_special_ability(target)
+        else:
+            actor.perform_combat_action(target)
+        actor.tick_effects()
+        if not target.is_alive():
+            return FightResult(winner=current, turns=turn)
+        current = 1 - current
+    return FightResult(winner=None, turns=max_turns)
+
+
+def simulate_matchup(class_a: str,
+                     class_b: str,
+                     fights: int,
+                     rng: random.Random,
+                     ability_chance: float = DEFAULT_ABILITY_CHANCE,
+                     max_turns: int = DEFAULT_MAX_TURNS) -> Tuple[int, int, int]:
+    """Retorna (victorias de class_a, victorias de class_b, empates) tras `fights` combates."""
+    factory_a, factory_b = CLASS_FACTORIES[class_a](), CLASS_FACTORIES[class_b]()
+    wins_a = wins_b = draws = 0
+    for _ in range(fights):
+        result = simulate_fight(factory_a.create_character(class_a),
+                                factory_b.create_character(class_b),
+                                rng, ability_chance, max_turns)
+        if result.winner == 0:
+            wins_a += 1
+        elif result.winner == 1:
+            wins_b += 1
+        else:
+            draws += 1
+    return wins_a, wins_b, draws
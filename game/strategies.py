@@ -44,7 +44,14 @@ class SpellCastingStrategy(CombatStrategy):
     SPELL_DAMAGE = 15
 
     def execute_action(self, actor: 'Character', target: 'Character') -> str:
-        if hasattr(actor, 'mana'):
+        return self.cast(actor, target, hasattr(actor, 'mana'))
+
+    def cast(self, actor: 'Character', target: 'Character', is_caster: bool) -> str:
+        """
+        Lanza el hechizo. Quien ya sabe si el actor tiene maná (ej. las reglas compiladas,
+        que lo averiguan una vez por clase) lo indica con is_caster y se ahorra el hasattr.
+        """
+        if is_caster:
             if actor.mana >= self.SPELL_COST:
                 actor.mana -= self.SPELL_COST
                 if target.health > 0:
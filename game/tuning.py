@@ -0,0 +1,287 @@
+# game/tuning.py
+"""
+Barrido de parámetros y ajuste automático de las constantes del juego.
+Cada configuración (valores para BASE_WARRIOR_HEALTH_BONUS, BASE_MAGE_MANA,
+SPELL_DAMAGE, bonus de ítems...) se evalúa con combates simulados en paralelo.
+Las configuraciones compiten en rondas ("racing"): tras cada ronda se calcula un
+intervalo de confianza de Hoeffding para la distancia a las tasas de victoria
+objetivo y se descartan las que ya son claramente peores que la mejor, así que las
+malas configuraciones se abandonan tras unos cientos de combates.
+
+Uso:
+    python -m game.tuning --samples 30 --workers 4 --target Warrior=0.5 --target Mage=0.5
+"""
+import argparse
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from game import characters, constants
+from game.items import Sword, Staff, Dagger, Chainmail, Robe, LeatherArmor
+from game.simulation import CLASS_FACTORIES, DEFAULT_ABILITY_CHANCE, DEFAULT_MAX_TURNS, simulate_matchup
+from game.strategies import SpellCastingStrategy
+
+Config = Dict[str, int]
+
+
+class Parameter(NamedTuple):
+    # Lugares donde vive el valor: las constantes se importan por valor en varios módulos,
+    # así que hay que actualizarlas en todos para que la simulación las vea.
+    targets: Tuple[Tuple[object, str], ...]
+    values: Tuple[int, ...]
+
+    def current(self) -> int:
+        owner, attr = self.targets[0]
+        return getattr(owner, attr)
+
+
+def _constant(name: str, values: range) -> Parameter:
+    return Parameter(((constants, name), (characters, name)), tuple(values))
+
+
+PARAMETERS: Dict[str, Parameter] = {
+    "BASE_WARRIOR_HEALTH_BONUS": _constant("BASE_WARRIOR_HEALTH_BONUS", range(0, 61, 5)),
+    "BASE_MAGE_MANA": _constant("BASE_MAGE_MANA", range(40, 201, 10)),
+    "SpellCastingStrategy.SPELL_DAMAGE": Parameter(((SpellCastingStrategy, "SPELL_DAMAGE"),), tuple(range(5, 31))),
+    "Sword.ATTACK_BONUS": Parameter(((Sword, "ATTACK_BONUS"),), tuple(range(1, 21))),
+    "Staff.ATTACK_BONUS": Parameter(((Staff, "ATTACK_BONUS"),), tuple(range(1, 16))),
+    "Dagger.ATTACK_BONUS": Parameter(((Dagger, "ATTACK_BONUS"),), tuple(range(1, 16))),
+    "Chainmail.DEFENSE_BONUS": Parameter(((Chainmail, "DEFENSE_BONUS"),), tuple(range(0, 13))),
+    "Robe.DEFENSE_BONUS": Parameter(((Robe, "DEFENSE_BONUS"),), tuple(range(0, 9))),
+    "LeatherArmor.DEFENSE_BONUS": Parameter(((LeatherArmor, "DEFENSE_BONUS"),), tuple(range(0, 11))),
+}
+
+
+def current_config(names: Sequence[str]) -> Config:
+    return {name: PARAMETERS[name].current() for name in names}
+
+
+@contextmanager
+def apply_config(config: Config) -> Iterator[None]:
+    """Aplica temporalmente los valores de `config` y restaura los originales al salir."""
+    saved = []
+    try:
+        for name, value in config.items():
+            for owner, attr in PARAMETERS[name].targets:
+                saved.append((owner, attr, getattr(owner, attr)))
+                setattr(owner, attr, value)
+        yield
+    finally:
+        for owner, attr, value in reversed(saved):
+            setattr(owner, attr, value)
+
+
+def run_batch(config: Config, fights_per_matchup: int, seed: int,
+              ability_chance: float = DEFAULT_ABILITY_CHANCE,
+              max_turns: int = DEFAULT_MAX_TURNS) -> Dict[str, Tuple[int, int]]:
+    """
+    Juega `fights_per_matchup` combates de cada cruce entre clases distintas.
+    Retorna por clase (puntos, combates), donde una victoria vale 2 puntos y un empate 1,
+    para trabajar con enteros. Se ejecuta en los procesos del pool.
+    """
+    rng = random.Random(seed)
+    totals = {name: [0, 0] for name in CLASS_FACTORIES}
+    with apply_config(config):
+        for class_a, class_b in itertools.combinations(CLASS_FACTORIES, 2):
+            wins_a, wins_b, draws = simulate_matchup(class_a, class_b, fights_per_matchup, rng,
+                                                     ability_chance, max_turns)
+            totals[class_a][0] += 2 * wins_a + draws
+            totals[class_b][0] += 2 * wins_b + draws
+            totals[class_a][1] += fights_per_matchup
+            totals[class_b][1] += fights_per_matchup
+    return {name: (points, fights) for name, (points, fights) in totals.items()}
+
+
+class Candidate:
+    def __init__(self, config: Config):
+        self.config = config
+        self.points: Dict[str, int] = {name: 0 for name in CLASS_FACTORIES}
+        self.fights: Dict[str, int] = {name: 0 for name in CLASS_FACTORIES}
+        self.eliminated = False
+
+    def add(self, batch: Dict[str, Tuple[int, int]]):
+        for name, (points, fights) in batch.items():
+            self.points[name] += points
+            self.fights[name] += fights
+
+    def win_rate(self, name: str) -> float:
+        return self.points[name] / (2 * self.fights[name]) if self.fights[name] else 0.5
+
+    def total_fights(self) -> int:
+        return sum(self.fights.values()) // 2 # Cada combate cuenta para dos clases
+
+    def loss_bounds(self, targets: Dict[str, float], log_term: float) -> Tuple[float, float, float]:
+        """
+        Distancia máxima a las tasas objetivo: (estimación, cota inferior, cota superior).
+        La media hora de Hoeffding es sqrt(log_term / (2n)) para n combates de la clase.
+        """
+        estimate = low = high = 0.0
+        for name, target in targets.items():
+            error = abs(self.win_rate(name) - target)
+            n = self.fights[name]
+            half_width = math.sqrt(log_term / (2 * n)) if n else 1.0
+            estimate = max(estimate, error)
+            low = max(low, error - half_width)
+            high = max(high, error + half_width)
+        return estimate, low, high
+
+
+def hoeffding_log_term(classes: int, candidates: int, rounds: int, confidence: float) -> float:
+    """
+    ln(2·K/δ) para la unión de K = clases × candidatas × rondas intervalos. Contar las
+    rondas hace que la cota siga siendo válida aunque se revise tras cada ronda: cada
+    candidata solo puede tener `rounds` tamaños de muestra distintos.
+    """
+    return math.log(2 * classes * candidates * rounds / (1 - confidence))
+
+
+def race(candidates: List[Candidate],
+         targets: Dict[str, float],
+         executor: Optional[ProcessPoolExecutor],
+         fights_per_batch: int,
+         max_fights: int,
+         log_term: float,
+         seed: int) -> List[Candidate]:
+    """
+    Evalúa las candidatas por rondas y elimina las que son peores que la mejor según
+    intervalos de media anchura sqrt(log_term / 2n). Termina cuando queda una sola o se
+    alcanza max_fights por candidata. Retorna las supervivientes.
+    """
+    batch_seed = itertools.count(seed * 1_000_003)
+    active = [candidate for candidate in candidates if not candidate.eliminated]
+
+    while len(active) > 1 or (active and active[0].total_fights() == 0):
+        pending = [candidate for candidate in active if candidate.total_fights() < max_fights]
+        if not pending:
+            break
+        jobs = [(candidate.config, fights_per_batch, next(batch_seed)) for candidate in pending]
+        if executor is None:
+            results = [run_batch(*job) for job in jobs]
+        else:
+            results = list(executor.map(run_batch, *zip(*jobs)))
+        for candidate, batch in zip(pending, results):
+            candidate.add(batch)
+
+        best_high = min(candidate.loss_bounds(targets, log_term)[2] for candidate in active)
+        for candidate in active:
+            if candidate.loss_bounds(targets, log_term)[1] > best_high:
+                candidate.eliminated = True
+        active = [candidate for candidate in active if not candidate.eliminated]
+    return active
+
+
+def _random_config(names: Sequence[str], rng: random.Random) -> Config:
+    return {name: rng.choice(PARAMETERS[name].values) for name in names}
+
+
+def _neighbor(config: Config, rng: random.Random) -> Config:
+    """Mueve uno o dos parámetros a un valor adyacente de su rango."""
+    neighbor = dict(config)
+    for name in rng.sample(sorted(config), k=min(len(config), rng.choice((1, 2)))):
+        values = PARAMETERS[name].values
+        index = values.index(neighbor[name]) if neighbor[name] in values else len(values) // 2
+        neighbor[name] = values[max(0, min(len(values) - 1, index + rng.choice((-1, 1))))]
+    return neighbor
+
+
+def tune(names: Sequence[str],
+         targets: Dict[str, float],
+         samples: int = 20,
+         generations: int = 3,
+         fights_per_batch: int = 20,
+         max_fights: int = 3000,
+         confidence: float = 0.95,
+         workers: int = 1,
+         seed: int = 0) -> List[Candidate]:
+    """
+    Busca configuraciones cercanas a las tasas objetivo. La primera generación es la
+    configuración actual más `samples` configuraciones aleatorias; las siguientes
+    exploran vecinos de la mejor encontrada. Retorna todas las candidatas evaluadas.
+    """
+    rng = random.Random(seed)
+    seen = set()
+    evaluated: List[Candidate] = []
+
+    def fresh(configs: List[Config]) -> List[Candidate]:
+        new = []
+        for config in configs:
+            key = tuple(sorted(config.items()))
+            if key not in seen:
+                seen.add(key)
+                new.append(Candidate(config))
+        evaluated.extend(new)
+        return new
+
+    # La confianza es global: la unión cubre todas las candidatas de todas las generaciones
+    # (la mejor que pasa a la siguiente generación se cuenta como una candidata más, ya que
+    # sigue acumulando combates) y todas las rondas en que se puede revisar su intervalo.
+    fights_per_round = fights_per_batch * len(list(itertools.combinations(CLASS_FACTORIES, 2)))
+    max_rounds = math.ceil(max_fights / fights_per_round)
+    max_candidates = (samples + 1) * generations
+    log_term = hoeffding_log_term(len(targets), max_candidates, max_rounds, confidence)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        pool = fresh([current_config(names)] + [_random_config(names, rng) for _ in range(samples)])
+        for generation in range(generations):
+            survivors = race(pool, targets, executor, fights_per_batch, max_fights, log_term, seed + generation)
+            best = ranked(survivors or pool, targets)[0]
+            print(f"Generación {generation + 1}: {len(pool)} configuraciones, "
+                  f"{len(survivors)} sobreviven. Mejor distancia: {best.loss_bounds(targets, 0)[0]:.3f}")
+            if generation + 1 < generations:
+                pool = [best] + fresh([_neighbor(best.config, rng) for _ in range(samples)])
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return evaluated
+
+
+def ranked(candidates: List[Candidate], targets: Dict[str, float]) -> List[Candidate]:
+    return sorted(candidates, key=lambda candidate: (candidate.eliminated,
+                                                     candidate.loss_bounds(targets, 0)[0],
+                                                     -candidate.total_fights()))
+
+
+def _parse_target(text: str) -> Tuple[str, float]:
+    name, _, value = text.partition("=")
+    if name not in CLASS_FACTORIES or not value:
+        raise argparse.ArgumentTypeError(f"Objetivo inválido '{text}'. Formato: Clase=tasa, clases: {', '.join(CLASS_FACTORIES)}.")
+    return name, float(value)
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description="Ajusta las constantes del juego con combates simulados.")
+    parser.add_argument("--param", action="append", choices=sorted(PARAMETERS), dest="params",
+                        help="Parámetro a ajustar (repetible). Por defecto, todos.")
+    parser.add_argument("--target", action="append", type=_parse_target, dest="targets",
+                        help="Tasa de victoria objetivo, ej. Mage=0.5 (repetible). Por defecto 0.5 para todas las clases.")
+    parser.add_argument("--samples", type=int, default=20, help="Configuraciones nuevas por generación.")
+    parser.add_argument("--generations", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=20, help="Combates por cruce de clases en cada ronda.")
+    parser.add_argument("--max-fights", type=int, default=3000, help="Tope de combates por configuración.")
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procesos en paralelo.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=5, help="Configuraciones a mostrar.")
+    args = parser.parse_args(argv)
+
+    names = args.params or sorted(PARAMETERS)
+    targets = dict(args.targets) if args.targets else {name: 0.5 for name in CLASS_FACTORIES}
+    evaluated = tune(names, targets, args.samples, args.generations, args.batch,
+                     args.max_fights, args.confidence, args.workers, args.seed)
+
+    print("\n" + "=" * 40)
+    for position, candidate in enumerate(ranked(evaluated, targets)[:args.top], start=1):
+        rates = ", ".join(f"{name} {candidate.win_rate(name):.2f}" for name in CLASS_FACTORIES)
+        print(f"#{position} distancia {candidate.loss_bounds(targets, 0)[0]:.3f} "
+              f"({candidate.total_fights()} combates) -> {rates}")
+        for name, value in sorted(candidate.config.items()):
+            print(f"    {name} = {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@
 Punto de entrada principal y bucle del juego de aventura basado en texto.
 Ahora con mecánicas de juego más funcionales.
 """
+import argparse
 import random
 from typing import Optional, List, Type # Para listas de tipos de enemigos
 
@@ -10,15 +11,23 @@ from game.factories import WarriorFactory, MageFactory, RogueFactory, CharacterE
 from game.characters import Character, Warrior, Mage, Rogue # Clases de personaje
 from game.items import Sword, Staff, Dagger, Chainmail, Robe, LeatherArmor # Ítems base para enemigos
 from game.strategies import AggressiveStrategy, DefensiveStrategy, SpellCastingStrategy # Para enemigos
+from game.rules import RuleStrategy # Comportamientos de enemigos descritos como reglas
 from game.commands import (
     Command, LookCommand, AttackCommand, MoveCommand,
-    ChangeStrategyCommand, SpecialAbilityCommand, QuitCommand
+    ChangeStrategyCommand, SpecialAbilityCommand, QuitCommand,
+    TickEffectsCommand, RewindCommand, CommandHistory
 )
 from game.constants import STRATEGY_NAMES # Para mensajes de ayuda
+from game.analytics import AsyncRecorder, SQLiteSink # Registro opcional de combates
 
 # --- Configuración de Enemigos ---
 ENEMY_TYPES: List[Type[CharacterEquipmentFactory]] = [RogueFactory, WarriorFactory] # Fábricas para tipos de enemigos
 ENEMY_NAMES = ["Ladrón Sombrío", "Orco Bruto", "Esqueleto Guardián", "Lobo Feroz", "Bandido Despiadado"]
+ENEMY_BEHAVIORS = [ # Se compilan una sola vez (ver game/rules.py)
+    "attack",
+    "if hp < 30% defend, else attack",
+    "if fury == 0 and target_hp > 50% ability, else attack",
+]
 
 # --- Funciones Auxiliares ---
 def spawn_enemy(player_level: int = 1) -> Optional[Character]:
@@ -33,14 +42,14 @@ def spawn_enemy(player_level: int = 1) -> Optional[Character]:
     # Personaliza el enemigo (opcional, podrías ajustar su estrategia o nivel aquí)
     enemy = enemy_factory.create_character(f"{enemy_name} (Nivel {player_level})")
     
-    # Los enemigos podrían tener estrategias diferentes por defecto o aleatorias
-    # Por ahora, la estrategia por defecto de su clase (ej. Rogue -> Aggressive) se aplica.
-    # Opcional: enemy.set_combat_strategy(random.choice([AggressiveStrategy(), DefensiveStrategy()])())
+    # Los enemigos reciben un comportamiento aleatorio del lenguaje de reglas
+    enemy.set_combat_strategy(RuleStrategy(random.choice(ENEMY_BEHAVIORS)))
 
     print(f"\n¡Un {enemy.name} ({enemy.__class__.__name__}) aparece rugiendo!")
     return enemy
 
-def parse_input(input_str: str, player: Character, current_enemy: Optional[Character]) -> Optional[Command]:
+def parse_input(input_str: str, player: Character, current_enemy: Optional[Character],
+                history: Optional[CommandHistory] = None) -> Optional[Command]:
     """
     Parsea la entrada del usuario y la convierte en un objeto Comando.
     Retorna un Comando o None si la entrada no es válida.
@@ -78,24 +87,35 @@ def parse_input(input_str: str, player: Character, current_enemy: Optional[Chara
             return None
     elif action == "habilidad":
         return SpecialAbilityCommand(player, target_enemy) # Habilidad puede requerir un objetivo
+    elif action == "deshacer" and history is not None:
+        turns = 1
+        if len(parts) > 1:
+            if not parts[1].isdigit() or int(parts[1]) < 1:
+                print("Deshacer ¿cuántos turnos? (ej: deshacer 2)")
+                return None
+            turns = int(parts[1])
+        return RewindCommand(history, turns)
     elif action == "salir":
         return QuitCommand()
     else:
-        print(f"Comando desconocido: '{action}'. Comandos: mirar (enemigo), atacar, mover, estrategia, habilidad, salir.")
+        print(f"Comando desconocido: '{action}'. Comandos: mirar (enemigo), atacar, mover, estrategia, habilidad, deshacer, salir.")
         return None
 
-def game_loop(player: Character):
+def game_loop(player: Character, recorder: Optional[AsyncRecorder] = None):
     """Bucle principal del juego con mecánicas funcionales."""
     print("\n" + "="*40)
     print("--- ¡LA AVENTURA COMIENZA DE VERDAD! ---")
-    print("Comandos: mirar (o mirar enemigo), atacar, mover [dir], estrategia [nombre], habilidad, salir.")
+    print("Comandos: mirar (o mirar enemigo), atacar, mover [dir], estrategia [nombre], habilidad, deshacer [n], salir.")
     print("="*40 + "\n")
 
     player_level = 1 # Nivel del jugador, podría usarse para escalar enemigos
     enemies_defeated_count = 0
     current_enemy = spawn_enemy(player_level)
+    history = CommandHistory() # Permite rebobinar turnos dentro del encuentro actual
+    encounter_id = 1 # Para la analítica: encuentro actual
 
     while True:
+        history.end_turn()
         print("\n" + "-"*10 + " TU TURNO " + "-"*10)
         if current_enemy:
             print(current_enemy.describe()) # Muestra estado del enemigo al inicio del turno del jugador
@@ -107,11 +127,19 @@ def game_loop(player: Character):
             break
         
         user_input = input(f"\n{player.name} (Salud: {player.health})> ")
-        command = parse_input(user_input, player, current_enemy)
+        command = parse_input(user_input, player, current_enemy, history)
 
         player_action_feedback = ""
+        if isinstance(command, RewindCommand):
+            # Rebobinar no consume turno: ni efectos ni acción del enemigo
+            print(f"\n{command.execute()}")
+            if recorder:
+                recorder.discard_undone() # Las acciones rebobinadas no cuentan para la analítica
+            continue
         if isinstance(command, Command):
-            player_action_feedback = command.execute()
+            player_action_feedback = history.execute(command)
+            if recorder:
+                recorder.record_command(encounter_id, command)
 
             if player_action_feedback == "salir_command_signal":
                 print("\n¡Gracias por jugar! ¡Hasta la próxima aventura!")
@@ -121,17 +149,21 @@ def game_loop(player: Character):
             if player_action_feedback: # Imprime el resultado de la acción del jugador
                  print(f"\n{player_action_feedback}")
             
-            player.tick_effects() # Actualizar efectos como Furia
+            history.execute(TickEffectsCommand(player)) # Actualizar efectos como Furia
 
         # Verificar si el enemigo fue derrotado por la acción del jugador
         if current_enemy and not current_enemy.is_alive():
             print(f"\n¡Has derrotado a {current_enemy.name}!")
+            if recorder:
+                recorder.record_encounter(encounter_id, player, current_enemy, player)
+            encounter_id += 1
             current_enemy = None
             enemies_defeated_count += 1
             player_level +=1 # El jugador sube de nivel simbólicamente
             print(f"Has derrotado {enemies_defeated_count} enemigos.")
             # Pequeña recompensa o preparación para el siguiente
             player.heal(player.max_health // 4) # Jugador se cura un 25%
+            history.clear() # No se puede rebobinar a un encuentro anterior
             print("Te sientes revitalizado para el próximo combate...")
             current_enemy = spawn_enemy(player_level) # Nuevo enemigo aparece
 
@@ -149,11 +181,16 @@ def game_loop(player: Character):
 
             if should_enemy_act:
                 print("\n" + "-"*10 + f" TURNO DE {current_enemy.name.upper()} " + "-"*10)
-                enemy_action_result = current_enemy.perform_combat_action(player)
+                enemy_command = AttackCommand(current_enemy, player)
+                enemy_action_result = history.execute(enemy_command)
                 print(enemy_action_result)
-                current_enemy.tick_effects() # Enemigos también podrían tener efectos
+                if recorder:
+                    recorder.record_command(encounter_id, enemy_command)
+                history.execute(TickEffectsCommand(current_enemy)) # Enemigos también podrían tener efectos
 
                 if not player.is_alive(): # Comprobar si el jugador fue derrotado por el enemigo
+                    if recorder:
+                        recorder.record_encounter(encounter_id, player, current_enemy, current_enemy)
                     print(player.describe()) # Mostrar estado final del jugador
                     print(f"\nGAME OVER: ¡{player.name} ha sido derrotado por {current_enemy.name}!")
                     print(f"Enemigos derrotados: {enemies_defeated_count}")
@@ -172,6 +209,10 @@ def game_loop(player: Character):
 
 def main():
     """Función principal para iniciar el juego."""
+    parser = argparse.ArgumentParser(description="Juego de aventura con patrones de diseño.")
+    parser.add_argument("--analytics", metavar="DB", help="Guarda la analítica de los combates en esta base SQLite.")
+    args = parser.parse_args()
+
     print("="*50)
     print("  Bienvenido al Juego de Aventura con Patrones de Diseño  ")
     print("             -- Edición Funcional --                 ")
@@ -199,7 +240,14 @@ def main():
 
     player = player_factory.create_character(player_name) # type: ignore # Sabemos que player_factory no será None aquí
 
-    game_loop(player)
+    recorder = AsyncRecorder(sinks=[SQLiteSink(args.analytics)]) if args.analytics else None
+    try:
+        game_loop(player, recorder)
+    finally:
+        if recorder:
+            recorder.close()
+            if recorder.error is not None:
+                print(f"\nNo se pudo guardar la analítica ({recorder.error}); {recorder.dropped} eventos descartados.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file